@@ -1,4 +1,5 @@
-from typing import TYPE_CHECKING
+import asyncio
+from typing import TYPE_CHECKING, Optional
 
 from src.services.database import database_service
 from src.services.rabbitmq import rabbitmq_service
@@ -10,17 +11,52 @@ if TYPE_CHECKING:
     from src.services.redis import RedisService
 
 
+# Блокировки гарантируют, что connect() вызовет только одна корутина.
+# После подключения сервис сохраняется в модульную переменную, и
+# горячий путь сводится к одной проверке без вызова методов
+_db_lock = asyncio.Lock()
+_database: Optional["DatabaseService"] = None
+
+_rabbit_lock = asyncio.Lock()
+_rabbit: Optional["RabbitMQService"] = None
+
+_redis_lock = asyncio.Lock()
+_redis: Optional["RedisService"] = None
+
+
 async def get_database() -> "DatabaseService":
-    if not database_service.initialized:
-        await database_service.connect()
-    return database_service
+    return _database or await _connect_database()
 
 async def get_rabbit() -> "RabbitMQService":
-    if not rabbitmq_service.initialized:
-        await rabbitmq_service.connect()
-    return rabbitmq_service
+    return _rabbit or await _connect_rabbit()
 
 async def get_redis() -> "RedisService":
-    if not redis_service.redis_client:
-        await redis_service.connect()
-    return redis_service
\ No newline at end of file
+    return _redis or await _connect_redis()
+
+
+async def _connect_database() -> "DatabaseService":
+    global _database
+    async with _db_lock:
+        if not database_service.initialized:
+            await database_service.connect()
+        _database = database_service
+    return database_service
+
+async def _connect_rabbit() -> "RabbitMQService":
+    global _rabbit
+    async with _rabbit_lock:
+        if not rabbitmq_service.initialized:
+            await rabbitmq_service.connect()
+        _rabbit = rabbitmq_service
+    return rabbitmq_service
+
+async def _connect_redis() -> "RedisService":
+    global _redis
+    async with _redis_lock:
+        if not redis_service.redis_client:
+            await redis_service.connect()
+        # connect() не пробрасывает ошибку, поэтому запоминаем
+        # сервис только при успешном подключении
+        if redis_service.redis_client:
+            _redis = redis_service
+    return redis_service
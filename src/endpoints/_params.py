@@ -0,0 +1,7 @@
+from fastapi.params import Query
+
+# Общие описания query-параметров для всех роутеров
+USER_ID_Q = Query(..., description='User ID', examples=[123])
+OPTIONAL_USER_ID_Q = Query(None, description='User ID пользователя')
+WORD_ID_Q = Query(..., description='Word ID which it goes by in DB')
+TARGET_Q = Query(..., description='Users target for quering DB')
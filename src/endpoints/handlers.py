@@ -1,20 +1,36 @@
 from typing import TYPE_CHECKING, Dict
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.params import Query
+from fastapi.responses import ORJSONResponse
 
 from src.dependencies import get_database, get_rabbit
+from src.endpoints._params import USER_ID_Q, TARGET_Q
 from src.exc import PostgresConnectionError
-from src.logconf import opt_logger as log
 from src.models import Location, Profile
-from src.models.bot_models import User, Target
+from src.models.bot_models import TARGET_BY_VALUE, User, Target
 from src.services.rabbitmq import RabbitMQService
 
 if TYPE_CHECKING:
     from src.services.database import DatabaseService
 
 router = APIRouter(prefix='/api/v0')
-logger = log.setup_logger('handlers')
+
+
+# Заранее сериализованные тела ответов для проверок наличия
+_TRUE_BODY = b'true'
+_FALSE_BODY = b'false'
+
+# Цели запроса, для которых у пользователя должен быть профиль
+_PROFILE_TARGETS = frozenset({
+    Target.ALL, Target.PROFILE, Target.NICK,
+    Target.DATING, Target.INTRO, Target.STATUS, Target.EMAIL
+})
+
+
+def _bool_response(value: bool) -> Response:
+    """ Отдает готовое JSON-тело без сериализации """
+    return Response(_TRUE_BODY if value else _FALSE_BODY, media_type='application/json')
 
 
 @router.get('/health')
@@ -26,81 +42,109 @@ async def check_connection(database: "DatabaseService"=Depends(get_database)):
 
 @router.get('/user_exists')
 async def check_user_exists(
-        user_id: int = Query(..., description='User ID', examples=[123]),
+        user_id: int = USER_ID_Q,
         database: "DatabaseService"=Depends(get_database)
 ):
-    return await database.user_exists(user_id)
+    return _bool_response(await database.user_exists(user_id))
 
 @router.get('/profile_exists')
 async def check_profile_exists(
-        user_id: int = Query(..., description='User ID', examples=[123]),
+        user_id: int = USER_ID_Q,
+        database: "DatabaseService" = Depends(get_database)
+):
+    return _bool_response(await database.profile_exists(user_id))
+
+@router.get('/user_flags')
+async def get_user_flags(
+        user_id: int = USER_ID_Q,
         database: "DatabaseService" = Depends(get_database)
 ):
-    return await database.profile_exists(user_id)
+    """ Все признаки пользователя за один запрос к БД """
+    return ORJSONResponse(await database.get_user_flags(user_id))
 
-@router.get('/nickname_exists')
+@router.get('/user_bundle')
+async def get_user_bundle(
+        user_id: int = USER_ID_Q,
+        database: "DatabaseService" = Depends(get_database)
+):
+    """ Пользователь, профиль и локация за один запрос к БД """
+    bundle = await database.get_user_bundle(user_id)
+    if bundle is None:
+        raise HTTPException(status_code=404, detail=f'Data for user {user_id} not found')
+    return ORJSONResponse(bundle)
+
+@router.get('/nickname_exists', response_model=bool)
 async def check_nickname_exists(
         nickname: str = Query(..., description='some user`s nickname'),
         database: "DatabaseService"=Depends(get_database)
-) -> bool:
+):
     """ Проверяет наличие на никнейм в БД """
-    return await database.nickname_exists(nickname)
+    return _bool_response(await database.nickname_exists(nickname))
 
 
 @router.get('/users')
 async def get_user_info(
-        user_id: int = Query(..., description='User ID', examples=[123]),
-        target_field: str = Query(..., description="Users target for quering DB"),
+        user_id: int = USER_ID_Q,
+        target_field: str = TARGET_Q,
         database: "DatabaseService" = Depends(get_database)
 ):
     """ Извлекает конкретные данные пользователя из БД """
-    try:
-        # Пытается привести строку к формату
-        target = Target(target_field)
-    except Exception:
+    target = TARGET_BY_VALUE.get(target_field)
+    if target is None:
         raise HTTPException(status_code=400, detail="Incorrect input")
 
-    if target in [
-        Target.ALL, Target.PROFILE, Target.NICK,
-        Target.DATING, Target.INTRO, Target.STATUS, Target.EMAIL
-    ]:
-        profile_exists = await database.profile_exists(user_id)
-        if not profile_exists: raise HTTPException(status_code=405, detail='Target not allowed')
+    if target in _PROFILE_TARGETS:
+        # Наличие профиля и данные проверяются одним запросом
+        user_data = await database.query_target_if_profile_exists(user_id, target)
+        if user_data is None: raise HTTPException(status_code=405, detail='Target not allowed')
+    else:
+        user_data = await database.query_criteria_by_target(user_id, target)
 
-    if user_data := await database.query_criteria_by_target(user_id, target):
-        return user_data
+    if user_data:
+        # Возвращаем ответ напрямую, минуя jsonable_encoder
+        return ORJSONResponse(user_data)
 
     raise HTTPException(status_code=404, detail=f'Data for user {user_id} not found')
 
-@router.post('/users')
+@router.post(
+    '/users', response_class=Response,
+    response_model=None, status_code=status.HTTP_202_ACCEPTED
+)
 async def save_user_handler(
         user_data: User,
         rabbit: "RabbitMQService" = Depends(get_rabbit)
 ):
     """ Сохраняет базовую информацию пользователя в БД """
-    logger.debug('Sending messages to RabbitMQ')
     await rabbit.publish_user(user_data)
+    return Response(status_code=status.HTTP_202_ACCEPTED)
 
-@router.post('/profiles')
+@router.post(
+    '/profiles', response_class=Response,
+    response_model=None, status_code=status.HTTP_202_ACCEPTED
+)
 async def save_profile_handler(
         profile_data: Profile,
         rabbit: "RabbitMQService" = Depends(get_rabbit)
-) -> None:
+):
     """ Сохраняет партнерский профиль пользователя в БД """
-    logger.debug('Senfing message to RabbitMQ')
     await rabbit.publish_profile(profile_data)
+    return Response(status_code=status.HTTP_202_ACCEPTED)
 
-@router.get('/location')
+@router.get('/location', response_model=Dict[str, str])
 async def get_location(
-        user_id: int = Query(..., description='User ID'),
+        user_id: int = USER_ID_Q,
         database: "DatabaseService" = Depends(get_database)
-) -> Dict[str, str]:
+):
     """ Возвращает город и страну пользователя из БД """
-    return await database.get_location(user_id)
+    return ORJSONResponse(await database.get_location(user_id))
 
-@router.post('/location')
+@router.post(
+    '/location', response_class=Response,
+    response_model=None, status_code=status.HTTP_202_ACCEPTED
+)
 async def add_location(
         location_data: Location,
         rabbit: "RabbitMQService" = Depends(get_rabbit)
 ):
-    await rabbit.publish_location(location_data)
\ No newline at end of file
+    await rabbit.publish_location(location_data)
+    return Response(status_code=status.HTTP_202_ACCEPTED)
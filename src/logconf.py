@@ -101,6 +101,11 @@ class CustomLogger:
     def setup_logger(self, name=None, level: str | int = config.log_level, name_width=20):
         """Настройка логгера с цветным выводом только уровней"""
 
+        # Уже настроенный логгер переиспользуется без пересоздания обработчиков
+        existing = logging.Logger.manager.loggerDict.get(name)
+        if isinstance(existing, logging.Logger) and existing.handlers:
+            return existing
+
         # Создаем логгер
         logger = logging.getLogger(name)
 
@@ -1,32 +1,42 @@
 import asyncio
-import json
 from contextlib import asynccontextmanager
 from functools import wraps
+from typing import TYPE_CHECKING
 
+import orjson
 import uvicorn
 from fastapi import FastAPI
-from faststream import FastStream
+from fastapi.responses import ORJSONResponse
+from faststream import Context, FastStream
 from faststream.rabbit import RabbitBroker
 from faststream.rabbit.annotations import RabbitMessage
 from starlette.middleware.cors import CORSMiddleware
 
-from endpoints.handlers import router as handlers_router
-from endpoints.words import router as words_router
-from src.config import config
-from src.dependencies import get_database
+from src.endpoints.handlers import router as handlers_router
+from src.endpoints.words import router as words_router
+from src.config import config, Purpose
+from src.dependencies import get_database, get_rabbit
 from src.logconf import opt_logger as log
-from src.models import User, Profile, Word
+from src.models import User, Profile, Word, Location
+
+if TYPE_CHECKING:
+    from src.services.database import DatabaseService
 
 logger = log.setup_logger('worker')
 broker = RabbitBroker(config.rabbit.url, logger=logger)
 
+_loads = orjson.loads
+
 
-# Словарь для хранения зарегистрированных
-# обработчиков по их назначению (purpose)
+# Обработчики, индексированные числовым назначением (Purpose)
+_HANDLERS: list = [None] * len(Purpose)
+
+# Словарь для хранения зарегистрированных обработчиков
+# по строковому назначению (purpose) от старых продюсеров
 purposes = {}
 
 # Декоратор для регистрации функций обработчиков
-def register_purpose(purpose: str):
+def register_purpose(purpose: Purpose):
 
     # Внешняя обертка декоратора,
     # принимающая параметр purpose
@@ -34,13 +44,14 @@ def register_purpose(purpose: str):
         # Сохраняем метаданные оригинальной функции
         @wraps(fn)
         # Асинхронная обертка вокруг оригинальной функции
-        async def wrapper(data):
+        async def wrapper(data, database):
             # Вызов оригинальной асинхронной функции
-            return await fn(data)
+            return await fn(data, database)
 
-        # Регистрируем функцию-обертку в
-        # словаре purposes под указанным ключом purpose
-        purposes[purpose] = wrapper
+        # Регистрируем функцию-обертку по индексу
+        # и под строковым ключом из config.purpose
+        _HANDLERS[purpose] = wrapper
+        purposes[getattr(config.purpose, purpose.name.lower())] = wrapper
 
         # Возвращаем зарегистрированную функцию-обертку
         return wrapper
@@ -49,92 +60,105 @@ def register_purpose(purpose: str):
     return decorator
 
 
+def _payload(data: dict, key: str) -> dict:
+    """ Достает модель из сообщения: объект или JSON-строку от старых продюсеров """
+    value = data[key]
+    return _loads(value) if isinstance(value, (str, bytes)) else value
+
 
-@register_purpose(config.purpose.add_user)
-async def add_user(data: dict) -> None:
+def get_handler(data: dict):
+    """ Находит обработчик по числовому назначению, иначе по строковому """
+    index = data.get("p")
+    if isinstance(index, int) and 0 <= index < len(_HANDLERS):
+        return _HANDLERS[index]
+    return purposes.get(data.get("purpose"))
+
+
+@register_purpose(Purpose.ADD_USER)
+async def add_user(data: dict, database: "DatabaseService") -> None:
     """ Добавляет пользователя """
-    database = await get_database()
-    user_dict = json.loads(data["user"])
+    user_dict = _payload(data, "user")
     user_data = User(**user_dict)
     await database.save_user(user_data)
     logger.info("New user processed by worker")
 
 
-@register_purpose(config.purpose.add_profile)
-async def add_profile(data: dict) -> None:
-    database = await get_database()
-    profile = json.loads(data["profile"])
+@register_purpose(Purpose.ADD_PROFILE)
+async def add_profile(data: dict, database: "DatabaseService") -> None:
+    profile = _payload(data, "profile")
     profile_data = Profile(**profile)
     await database.save_profile(profile_data)
 
 
-@register_purpose(config.purpose.add_location)
-async def add_location(data: dict) -> None:
-    database = await get_database()
-    location = json.loads(data["location"])
-    await database.save_location(location)
+@register_purpose(Purpose.ADD_LOCATION)
+async def add_location(data: dict, database: "DatabaseService") -> None:
+    location = _payload(data, "location")
+    location_data = Location(**location)
+    await database.save_location(location_data)
 
 
-@register_purpose(config.purpose.add_word)
-async def add_word(data: dict) -> None:
-    database = await get_database()
-    word = json.loads(data["word"])
+@register_purpose(Purpose.ADD_WORD)
+async def add_word(data: dict, database: "DatabaseService") -> None:
+    """ Добавляет новое слово, уже существующее пропускается """
+    word = _payload(data, "word")
+    word_data = Word(**word)
+    await database.save_word(word_data, overwrite=False)
+
+
+@register_purpose(Purpose.EDIT_WORD)
+async def edit_word(data: dict, database: "DatabaseService") -> None:
+    word = _payload(data, "word")
     word_data = Word(**word)
     await database.save_word(word_data)
 
 
-@broker.subscriber(config.rabbit.queue.new_users)
-async def handle_new_users(data: dict, msg: RabbitMessage):
+async def dispatch(data: dict, msg: RabbitMessage, database: "DatabaseService"):
     """ Находит обработчик для запроса в БД """
-    logger.info(f'Received message: {data}')
+    logger.info('Received message: %s', data)
     try:
         purpose = data.get("purpose")
-        handler = purposes.get(purpose)
+        handler = get_handler(data)
         # Вызываем соответствующий обработчик
-        if handler: await handler(data)
+        if handler: await handler(data, database)
 
-        logger.info(f"Successfully processed message with purpose: {purpose}")
+        logger.info("Successfully processed message with purpose: %s", purpose)
 
     except Exception as e:
         logger.error(f"Error in DB execution: {e}")
 
     finally: await msg.ack()
 
-@broker.subscriber(config.rabbit.queue.new_words)
-async def handle_new_words(data: dict, msg: RabbitMessage):
-    """ Находит обработчик для запроса в БД """
-    logger.info(f'Received message: {data}')
-    try:
-        purpose = data.get("purpose")
-        handler = purposes.get(purpose)
-        # Вызываем соответствующий обработчик
-        if handler: await handler(data)
-
-        logger.info(f"Successfully processed message with purpose: {purpose}")
-
-    except Exception as e:
-        logger.error(f"Error in DB execution: {e}")
 
-    finally: await msg.ack()
+@broker.subscriber(config.rabbit.queue.new_users)
+async def handle_new_users(data: dict, msg: RabbitMessage, database=Context()):
+    await dispatch(data, msg, database)
 
+@broker.subscriber(config.rabbit.queue.new_words)
+async def handle_new_words(data: dict, msg: RabbitMessage, database=Context()):
+    await dispatch(data, msg, database)
 
-async def background_worker():
-    while True:
-        try:
-            logger.info("Starting worker...")
-            worker = FastStream(broker, logger=logger)
-            await worker.run()
 
-        except Exception as e:
-            logger.error(f"Worker error: {e}")
-            break
+async def background_worker(database: "DatabaseService"):
+    logger.info("Starting worker...")
+    worker = FastStream(broker, logger=logger)
+    # Подключенный сервис БД один раз передается
+    # обработчикам воркера через контекст приложения
+    worker.context.set_global("database", database)
+    try:
+        await worker.run()
+    except Exception as e:
+        logger.error(f"Worker error: {e}")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI): # noqa
     # Запускаем воркер при старте приложения
-    await get_database()
-    task = asyncio.create_task(background_worker())
+    database = await get_database()
+    # Подключение к RabbitMQ запускает фоновую публикацию сообщений
+    rabbit = await get_rabbit()
+    # Подключаем брокер заранее, чтобы первое сообщение не ждало соединения
+    await broker.connect()
+    task = asyncio.create_task(background_worker(database))
     logger.info("Background worker started")
     yield
 
@@ -145,8 +169,13 @@ async def lifespan(app: FastAPI): # noqa
     except asyncio.CancelledError:
         logger.info("Background worker stopped")
 
+    # Отправляем накопленные сообщения перед закрытием соединения
+    await rabbit.disconnect()
+    # Записываем накопленные обновления пользователей и закрываем пул
+    await database.disconnect()
+
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 app.add_middleware(
     CORSMiddleware, # noqa
     allow_origins=["*"],
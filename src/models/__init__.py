@@ -5,8 +5,9 @@ __all__ = [
     'Profile',
     'Target',
     'Word',
+    'WordRow',
     'Stats'
 ]
 
 from .bot_models import User, Location, Profile, Target, Payment
-from .dict_models import Word, Stats
\ No newline at end of file
+from .dict_models import Word, WordRow, Stats
\ No newline at end of file
@@ -0,0 +1,9 @@
+from pydantic import BaseModel, ConfigDict
+
+
+class DBModel(BaseModel):
+    """
+    Базовая модель для данных, которые сохраняются в БД
+    """
+    # Схема строится при первом использовании, а не при импорте
+    model_config = ConfigDict(defer_build=True)
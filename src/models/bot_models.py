@@ -1,10 +1,13 @@
 from datetime import date, datetime, timedelta
+from decimal import Decimal
 from enum import Enum
-from typing import Optional, List, Any
+from functools import lru_cache
+from typing import Optional, List, Any, Dict, NamedTuple, Tuple
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import ConfigDict, Field, computed_field, field_validator
 
 from src.config import config
+from src.models.base import DBModel
 
 
 class Target(str, Enum):
@@ -26,9 +29,80 @@ class Target(str, Enum):
     CODE = 'lang_code'
 
 
+# Поиск цели по строковому значению без вызова Target(...)
+TARGET_BY_VALUE: Dict[str, Target] = {t.value: t for t in Target}
 
 
-class Coordinates(BaseModel):
+
+
+# Поддерживаемые форматы даты рождения
+_BIRTHDAY_FORMATS = (
+    "%d-%m-%Y",  # 03-01-2002
+    "%Y-%m-%d",  # 2002-01-03 (ISO)
+    "%d/%m/%Y",  # 03/01/2002
+    "%m/%d/%Y",  # 01/03/2002
+    "%d.%m.%Y",  # 03.01.2002
+    "%Y.%m.%d",  # 2002.01.03
+)
+
+# (разделитель, год в начале строки) -> подходящие форматы
+_BIRTHDAY_FORMATS_BY_SHAPE = {
+    ('-', False): ("%d-%m-%Y",),
+    ('-', True): ("%Y-%m-%d",),
+    ('/', False): ("%d/%m/%Y", "%m/%d/%Y"),
+    ('.', False): ("%d.%m.%Y",),
+    ('.', True): ("%Y.%m.%d",),
+}
+
+
+def _guess_birthday_formats(value: str) -> Tuple[str, ...]:
+    """ Подбирает форматы по форме строки, чтобы не перебирать все """
+    if len(value) > 4 and value[:4].isdigit():
+        key = (value[4], True)
+    elif len(value) > 2 and value[:2].isdigit():
+        key = (value[2], False)
+    elif len(value) > 1:
+        key = (value[1], False) # Однозначный день: 3-01-2002
+    else:
+        return ()
+    return _BIRTHDAY_FORMATS_BY_SHAPE.get(key, ())
+
+
+@lru_cache(maxsize=4096)
+def _parse_birthday_str(value: str) -> date:
+    """
+    Парсит строку даты рождения. Результат кэшируется: при импорте
+    одни и те же даты повторяются, а strptime работает медленно
+    """
+    # Почти все даты из БД приходят в ISO, fromisoformat реализован на C
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        pass
+
+    strptime = datetime.strptime
+
+    # Сначала пробует форматы, подобранные по форме строки
+    guessed = _guess_birthday_formats(value)
+    for fmt in guessed:
+        try:
+            return strptime(value, fmt).date()
+        except ValueError:
+            continue
+
+    # Эвристика не сработала - перебирает остальные форматы
+    for fmt in _BIRTHDAY_FORMATS:
+        if fmt in guessed:
+            continue
+        try:
+            return strptime(value, fmt).date()
+        except ValueError:
+            continue
+
+    raise ValueError(f"Invalid date format: {value}")
+
+
+class Coordinates(NamedTuple):
     """
     Модель первичной обработки геолокации пользователя
     """
@@ -36,10 +110,11 @@ class Coordinates(BaseModel):
     longitude: float
 
 
-class User(BaseModel):
+class User(DBModel):
     """
     Модель нового пользователя (для базы данных).
     """
+    model_config = ConfigDict(frozen=True, extra='ignore', validate_assignment=False)
 
     user_id: int
     username: Optional[str]
@@ -50,10 +125,12 @@ class User(BaseModel):
     topics: List[str]
     lang_code: str
 
-class Profile(BaseModel):
+class Profile(DBModel):
     """
     Модель профиля пользователя (для базы данных)
     """
+    model_config = ConfigDict(frozen=True, extra='ignore', validate_assignment=False)
+
     user_id: int = Field(..., description="User ID")
     nickname: str = Field(..., description="Уникальный никнейм пользователя")
     email: str = Field(..., description="Email пользователя")
@@ -74,49 +151,39 @@ class Profile(BaseModel):
             return value.date()
 
         if isinstance(value, str):
-            # Пробует разные форматы даты
-            formats = [
-                "%d-%m-%Y",  # 03-01-2002
-                "%Y-%m-%d",  # 2002-01-03 (ISO)
-                "%d/%m/%Y",  # 03/01/2002
-                "%m/%d/%Y",  # 01/03/2002
-                "%d.%m.%Y",  # 03.01.2002
-                "%Y.%m.%d",  # 2002.01.03
-            ]
-            for fmt in formats:
-                try:
-                    return datetime.strptime(value, fmt).date()
-                except ValueError:
-                    continue
-
-            raise ValueError(f"Invalid date format: {value}")
-
-class Payment(BaseModel):
+            return _parse_birthday_str(value)
+
+class Payment(DBModel):
     """
     Модель платежа (для базы данных).
+    Не используется в эндпоинтах, поэтому поля без метаданных OpenAPI
     """
 
-    user_id: int = Field(..., description="User ID")
-    amount: Optional[float] = Field(
-        199.00, description="Amount of payment in rubles user agreed to pay"
-    )
-    period: Optional[str] = Field(
-        "trial", description="Period of payment", examples=["month", "year"]
-    )
-    trial: Optional[bool] = Field(True, description="If it is trial period for user")
-    is_active: Optional[bool] = Field(True, description='If this subscription is still active')
-    until: Optional[datetime] = Field(
-        default=datetime.now(tz=config.tz_info) + timedelta(days=3), description="Trial period"
+    user_id: int
+    amount_minor: int = 19900 # Сумма в копейках
+    period: Optional[str] = "trial" # month, year
+    trial: Optional[bool] = True
+    is_active: Optional[bool] = True
+    until: Optional[datetime] = Field( # Конец пробного периода
+        default_factory=lambda: datetime.now(tz=config.tz_info) + timedelta(days=3)
     )
 
-    currency: Optional[str] = Field("RUB", description="Currency of payment")
-    payment_id: Optional[str] = Field(None, description="Payment ID")
+    currency: Optional[str] = "RUB"
+    payment_id: Optional[str] = None
 
+    @computed_field
+    @property
+    def amount(self) -> Decimal:
+        """ Сумма в рублях """
+        return Decimal(self.amount_minor).scaleb(-2)
 
-class Location(BaseModel):
+
+class Location(DBModel):
     """
     Модель вторичной обработки геолокации пользователя (для базы данных)
     """
+    model_config = ConfigDict(frozen=True, extra='ignore', validate_assignment=False)
+
     user_id: int = Field(..., description="User ID")
     latitude: Optional[str] = Field(None, description="Долгота координаты")
     longitude: Optional[str] = Field(None, description="Широта координаты")
@@ -1,12 +1,18 @@
+from dataclasses import dataclass, field
 from datetime import datetime, date
 from typing import Optional, Union, Any, Dict
 
-from pydantic import BaseModel, Field, model_validator, field_validator
+from pydantic import Field
 
 from src.config import config
+from src.models.base import DBModel
 
 
-class Word(BaseModel):
+def _iso_today() -> str:
+    return datetime.now(tz=config.tz_info).date().isoformat()
+
+
+class Word(DBModel):
     """
     Модель слова пользователя (для базы данных)
     """
@@ -16,41 +22,49 @@ class Word(BaseModel):
     word: Optional[str] = Field(None, description="Слово, которое нужно добавить в словарь")
     translations: Optional[dict] = Field(None, description="Перевод слова")
     is_public: bool = Field(False, description="Видно ли слово остальным пользователям")
-    created_at:Optional[Any] = Field(None, description="Время создания карточки со словом")
+    created_at: Optional[Any] = Field(
+        default_factory=_iso_today, description="Время создания карточки со словом"
+    )
     context: Optional[str] = Field(None, description="Контекст к слову")
     audio: Optional[bytes] = Field(None, description="bytes of audio recording")
 
-    @classmethod
-    @field_validator('created_at', mode='before')
-    def set_datetime_to_string(cls, value):
-        if isinstance(value, datetime):
-            value = value.date().isoformat()
-        elif isinstance(value, str):
-            try:
-                datetime.fromisoformat(value)
-            except ValueError:
-                value = datetime.now(tz=config.tz_info).isoformat()
-
-        return value
 
+@dataclass(slots=True)
+class WordRow:
+    """
+    Слово, прочитанное из БД, для ответов API. Данные уже проверены
+    базой, поэтому валидация pydantic не нужна, а orjson
+    сериализует dataclass напрямую
+    """
+    id: int
+    user_id: int
+    nickname: Optional[str]
+    word: str
+    translations: Dict[str, dict]
+    is_public: bool
+    created_at: str
+    context: Optional[str] = None
+    audio: Optional[bytes] = None
 
 
-class Stats(BaseModel):
+@dataclass(slots=True)
+class Stats:
     """
     Модель статистики слов пользователя
     """
-    total: int = Field(0, description="total count of all words")
-    nouns: int = Field(0, description="count of nouns")
-    verbs: int = Field(0, description="count of verbs")
-    adjectives: int = Field(0, description="count of adjectives")
-    adverbs: int = Field(0, description="count of adverbs")
-    others: int = Field(0, description="count of other words")
-
-    @model_validator(mode='after')
-    def set_total_status(self) -> 'Stats':
-        self.total =  self.nouns + \
-                      self.verbs + \
-                      self.adjectives + \
-                      self.adverbs + \
-                      self.others
-        return self
+    total: int = field(init=False, default=0)
+    nouns: int = 0
+    verbs: int = 0
+    adjectives: int = 0
+    adverbs: int = 0
+    others: int = 0
+    # Слова, добавленные за последнюю неделю (не входит в total)
+    last_week: int = 0
+
+    def __post_init__(self):
+        # total хранится в поле, чтобы попадать в JSON ответа
+        self.total = self.nouns + \
+                     self.verbs + \
+                     self.adjectives + \
+                     self.adverbs + \
+                     self.others
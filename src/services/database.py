@@ -1,46 +1,356 @@
 import asyncio
-from collections import defaultdict
-from contextlib import asynccontextmanager
-from datetime import datetime, timedelta
-from typing import Dict, Tuple, List, Optional
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import asynccontextmanager, suppress
+from functools import partial
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
 
 import asyncpg
 
 from src.config import config
 from src.exc import PaymentException, PostgresConnectionError
 from src.logconf import opt_logger as log
-from src.models import User, Target, Profile, Word, Location, Stats
+from src.models import User, Target, Profile, Word, WordRow, Location, Stats
 
 logger = log.setup_logger("database")
 
+# Период сброса накопленных обновлений пользователей в БД (секунды)
+USER_UPDATES_FLUSH_INTERVAL = 0.1
+
+# Кэш сводных данных пользователя: время жизни записи (секунды) и размер
+USER_BUNDLE_TTL = 30.0
+USER_BUNDLE_CACHE_SIZE = 10_000
+
+# Смещение часового пояса сервиса: время считается на стороне БД
+# как NOW() AT TIME ZONE, без datetime.now() в Python
+_TZ_OFFSET = config.tz_info.utcoffset(None)
+
+# Колонки для целей, которые читаются из профиля пользователя
+_PROFILE_TARGET_COLUMNS = {
+    Target.ALL: "u.*, p.nickname, p.email, p.birthday, p.dating, p.gender, p.intro, p.status",
+    Target.PROFILE: "p.*",
+    Target.NICK: "p.nickname",
+    Target.DATING: "p.dating",
+    Target.INTRO: "p.intro",
+    Target.STATUS: "p.status",
+    Target.EMAIL: "p.email",
+}
+
+# Таблица, в которой хранится каждый критерий пользователя
+_TARGET_TABLE = {
+    'language': 'users', 'fluency': 'users',
+    'topics': 'users', 'username': 'users',
+    'nickname': 'profiles', 'email': 'profiles',
+    'birthday': 'profiles', 'dating': 'profiles',
+    'gender': 'profiles', 'about': 'profiles'
+}
+
+# Готовый SQL для каждого критерия, чтобы не форматировать его на каждый вызов
+_SELECT_TARGET_SQL = {
+    column: f"SELECT {column} FROM {table} WHERE user_id = $1"
+    for column, table in _TARGET_TABLE.items()
+}
+_UPDATE_TARGET_SQL = {
+    column: f"UPDATE {table} SET {column} = $1 WHERE user_id = $2"
+    for column, table in _TARGET_TABLE.items()
+}
+
+# Схема БД: все таблицы создаются одним запросом в порядке зависимостей
+_SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS users (
+        user_id BIGINT PRIMARY KEY,
+        username VARCHAR(50) NOT NULL,
+        first_name VARCHAR(100) NOT NULL,
+        camefrom VARCHAR(50) NOT NULL,
+        language VARCHAR(20) NOT NULL,
+        fluency SMALLINT NOT NULL,
+        topics TEXT[] NOT NULL,
+        lang_code TEXT NOT NULL,
+        is_active BOOLEAN DEFAULT TRUE,
+        blocked_bot BOOLEAN DEFAULT FALSE,
+        last_notified TIMESTAMP DEFAULT NOW()
+    ) WITH (fillfactor = 85);
+
+    CREATE TABLE IF NOT EXISTS profiles (
+        user_id BIGINT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+        nickname VARCHAR(50) NOT NULL,
+        email VARCHAR(50) NOT NULL,
+        birthday DATE NOT NULL,
+        dating BOOLEAN DEFAULT FALSE,
+        gender VARCHAR(50) NULL,
+        intro TEXT NULL,
+        status VARCHAR(50) NOT NULL,
+        UNIQUE (user_id)
+    );
+
+    CREATE TABLE IF NOT EXISTS locations (
+        user_id BIGINT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+        latitude TEXT NULL,
+        longitude TEXT NULL,
+        city TEXT NULL,
+        country TEXT NULL,
+        timezone TEXT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS words (
+        id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        user_id BIGINT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+        word VARCHAR(100) NOT NULL,
+        is_public BOOLEAN DEFAULT FALSE,
+        word_state VARCHAR(20) DEFAULT 'NEW',
+        emotion VARCHAR(20) DEFAULT 'NEUTRAL',
+        correct_spelling BOOLEAN DEFAULT TRUE,
+        created_at TIMESTAMP DEFAULT NOW(),
+        edited_at TIMESTAMP DEFAULT NOW(),
+        edited BOOLEAN DEFAULT FALSE,
+        UNIQUE (user_id, word)
+    ) WITH (fillfactor = 85);
+
+    -- Запас места на странице под новые версии строк при частых UPDATE.
+    -- last_notified и blocked_bot в users не индексированы, поэтому их
+    -- обновления могут быть HOT. word_state входит в условие частичного
+    -- индекса words_user_lower_word_idx, и его обновления не HOT:
+    -- запас лишь оставляет новую версию строки на той же странице.
+    -- Для уже созданных таблиц действует на новые страницы.
+    -- ALTER TABLE берет блокировку и может ждать autovacuum,
+    -- поэтому выполняется, только если параметр еще не установлен
+    DO $$
+    DECLARE
+        tbl TEXT;
+    BEGIN
+        FOREACH tbl IN ARRAY ARRAY['users', 'words'] LOOP
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_class
+                WHERE oid = tbl::regclass
+                  AND 'fillfactor=85' = ANY(reloptions)
+            ) THEN
+                EXECUTE format('ALTER TABLE %I SET (fillfactor = 85)', tbl);
+            END IF;
+        END LOOP;
+    END
+    $$;
+
+    CREATE TABLE IF NOT EXISTS translations (
+        id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        word_id INTEGER NOT NULL REFERENCES words(id) ON DELETE CASCADE,
+        translation VARCHAR(255) NOT NULL,
+        part_of_speech VARCHAR(50) NOT NULL,
+        UNIQUE (word_id, translation, part_of_speech)
+    );
+
+    CREATE TABLE IF NOT EXISTS contexts (
+        id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        user_id BIGINT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+        word_id INTEGER NOT NULL REFERENCES words(id) ON DELETE CASCADE,
+        context TEXT NOT NULL,
+        edited BOOLEAN DEFAULT FALSE,
+        created_at TIMESTAMP DEFAULT NOW(),
+        UNIQUE (user_id, word_id)
+    );
+
+    CREATE TABLE IF NOT EXISTS audios (
+        id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        user_id BIGINT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+        audio_id INTEGER NOT NULL REFERENCES words(id) ON DELETE CASCADE,
+        audio_url TEXT NOT NULL,
+        edited BOOLEAN DEFAULT FALSE,
+        created_at TIMESTAMP DEFAULT NOW(),
+        UNIQUE (user_id, audio_id)
+    );
+
+    -- Поиск новых слов пользователя без учета регистра (mark_repeated_words)
+    CREATE INDEX IF NOT EXISTS words_user_lower_word_idx
+        ON words (user_id, LOWER(word))
+        WHERE word_state = 'NEW';
+
+    CREATE INDEX IF NOT EXISTS profiles_nickname_idx ON profiles (nickname);
+
+    -- Поиск публичных слов по всем пользователям (query_words без user_id)
+    CREATE INDEX IF NOT EXISTS words_public_word_idx
+        ON words (word)
+        WHERE is_public = TRUE;
+
+    -- JOIN контекстов по word_id: в UNIQUE (user_id, word_id) он не первый
+    CREATE INDEX IF NOT EXISTS contexts_word_id_idx ON contexts (word_id);
+
+    -- Поиск местоположения по user_id и цель для ON CONFLICT в save_location
+    CREATE UNIQUE INDEX IF NOT EXISTS locations_user_id_key ON locations (user_id);
+
+    -- Переход состояния слова после ответа. SQL-функция IMMUTABLE
+    -- встраивается планировщиком в запрос как обычное выражение
+    CREATE OR REPLACE FUNCTION word_state_transition(state TEXT, correct BOOLEAN)
+    RETURNS TEXT
+    LANGUAGE sql IMMUTABLE
+    AS $$
+        SELECT CASE
+            WHEN correct THEN
+                CASE state
+                    WHEN 'NEW' THEN 'REPEATED'
+                    WHEN 'REPEATED' THEN 'REINFORCED'
+                    WHEN 'REINFORCED' THEN 'LEARNED'
+                    ELSE state
+                END
+            ELSE
+                CASE state
+                    WHEN 'REPEATED' THEN 'NEW'
+                    WHEN 'REINFORCED' THEN 'REPEATED'
+                    WHEN 'LEARNED' THEN 'REINFORCED'
+                    ELSE state
+                END
+        END
+    $$;
+"""
+
+# Частые запросы, которые готовятся один раз на соединение.
+# Запросы на чтение готовятся только в пуле чтения
+_READ_STATEMENTS = {
+    # EXISTS всегда возвращает одну строку с bool
+    'user_exists': "SELECT EXISTS(SELECT 1 FROM users WHERE user_id = $1)",
+    'profile_exists': "SELECT EXISTS(SELECT 1 FROM profiles WHERE user_id = $1)",
+    'location_exists': "SELECT EXISTS(SELECT 1 FROM locations WHERE user_id = $1)",
+    'nickname_exists': "SELECT EXISTS(SELECT 1 FROM profiles WHERE nickname = $1)",
+    'word_exists': "SELECT EXISTS(SELECT 1 FROM words WHERE user_id = $1 AND word = $2)",
+    'is_user_blocked': "SELECT blocked_bot FROM users WHERE user_id = $1",
+    'get_location': "SELECT city, country FROM locations WHERE user_id = $1",
+    'get_user_flags': """
+        SELECT
+            EXISTS(SELECT 1 FROM users WHERE user_id = $1) AS user_exists,
+            EXISTS(SELECT 1 FROM profiles WHERE user_id = $1) AS profile_exists,
+            EXISTS(SELECT 1 FROM locations WHERE user_id = $1) AS location_exists,
+            COALESCE((SELECT blocked_bot FROM users WHERE user_id = $1), FALSE) AS blocked
+    """,
+    # Колонки перечислены явно: при SELECT * новая колонка в любой
+    # из таблиц ломала бы подготовленный запрос на всех соединениях
+    'get_user_bundle': """
+        SELECT
+            user_id, u.username, u.first_name, u.camefrom, u.language,
+            u.fluency, u.topics, u.lang_code, u.is_active, u.blocked_bot,
+            u.last_notified,
+            p.nickname, p.email, p.birthday, p.dating, p.gender,
+            p.intro, p.status,
+            l.latitude, l.longitude, l.city, l.country, l.timezone
+        FROM users u
+        LEFT JOIN profiles p USING (user_id)
+        LEFT JOIN locations l USING (user_id)
+        WHERE user_id = $1
+    """,
+}
+
+# Запросы на запись: готовятся только в пуле записи, так как
+# соединения пула чтения read-only и могут смотреть в реплику
+_WRITE_STATEMENTS = {
+    'update_word_state': """
+        UPDATE words SET word_state = word_state_transition(word_state, $3)
+        WHERE user_id = $1 AND word = $2
+    """,
+    # Слово с переводами, контекстом и аудио за один запрос: все CTE
+    # выполняются атомарно, а дочерние вставки пропускаются, если
+    # new_word пуст (слово существует и overwrite=False)
+    'save_word': """
+        WITH new_word AS (
+            INSERT INTO words (user_id, word, is_public)
+            VALUES ($1, $2, $3)
+            ON CONFLICT (user_id, word) DO UPDATE
+            SET is_public = EXCLUDED.is_public,
+                edited = TRUE,
+                edited_at = NOW()
+            WHERE $4
+            RETURNING id
+        ),
+        new_translations AS (
+            INSERT INTO translations (word_id, translation, part_of_speech)
+            SELECT new_word.id, t.translation, t.part_of_speech
+            FROM new_word,
+                 UNNEST($5::text[], $6::text[]) AS t(translation, part_of_speech)
+            ON CONFLICT (word_id, translation, part_of_speech) DO NOTHING
+        ),
+        new_context AS (
+            INSERT INTO contexts (user_id, word_id, context)
+            SELECT $1, new_word.id, $7::text
+            FROM new_word
+            WHERE $7::text IS NOT NULL
+            ON CONFLICT (user_id, word_id) DO UPDATE
+            SET context = EXCLUDED.context,
+                edited = TRUE
+        ),
+        new_audio AS (
+            INSERT INTO audios (user_id, audio_id, audio_url)
+            SELECT $1, new_word.id, $8::text
+            FROM new_word
+            WHERE $8::text IS NOT NULL
+            ON CONFLICT (user_id, audio_id) DO UPDATE
+            SET audio_url = EXCLUDED.audio_url,
+                edited = TRUE
+        )
+        SELECT id FROM new_word
+    """,
+}
+
+# Общий реестр для ленивой подготовки в _prepared
+_HOT_STATEMENTS = {**_READ_STATEMENTS, **_WRITE_STATEMENTS}
+
+
+class _Connection(asyncpg.Connection):
+    """ Соединение пула с кэшем подготовленных запросов """
+    __slots__ = ('statements',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.statements: Dict[str, asyncpg.prepared_stmt.PreparedStatement] = {}
+
 
 # = КЛАСС ДЛЯ РАБОТЫ С БАЗОЙ ДАННЫХ =
 class DatabaseService:
     def __init__(self):
-        self._pool: Optional[asyncpg.Pool | None] = None
-        self.user_locks = defaultdict(asyncio.Lock)
-        self.stats_lock = asyncio.Lock()
+        self._read_pool: Optional[asyncpg.Pool] = None
+        self._write_pool: Optional[asyncpg.Pool] = None
         self.initialized: bool = False
+        # user_id, ожидающие пакетного обновления
+        self._notified: Set[int] = set()
+        self._blocked: Set[int] = set()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._last_acquire_warning: float = 0.0
+        # user_id -> (момент устаревания, данные), порядок вставки для LRU
+        self._bundles: OrderedDict[int, Tuple[float, Dict[str, Any]]] = OrderedDict()
+        # user_id -> (число чтений в полете, поколение). Запись есть, только
+        # пока идет чтение; _invalidate_bundle увеличивает поколение
+        self._bundle_fetches: Dict[int, Tuple[int, int]] = {}
 
     async def connect(self):
         """Инициализация пула соединений и создание таблиц"""
         try:
-            # Создаем пул соединений
-            self._pool = await asyncpg.create_pool(
+            # Схема создается до пула, чтобы новые соединения
+            # могли сразу подготовить частые запросы. Без statement_timeout:
+            # первое построение индексов на большой таблице может идти
+            # дольше, а его отмена откатила бы весь скрипт схемы
+            conn = await asyncpg.connect(
                 config.database.url,
+                timeout=config.database.timeout,
+                server_settings={**config.database.server_settings, 'statement_timeout': '0'}
+            )
+            try:
+                await self._create_schema(conn)
+            finally:
+                await conn.close()
+
+            # Создаем пулы соединений для чтения и записи
+            self._read_pool = await self._create_pool(
+                config.database.read_url,
+                config.database.read_server_settings,
+                _READ_STATEMENTS,
                 min_size=config.database.min_size,
-                max_size=config.database.max_size,
-                timeout=config.database.timeout
+                max_size=config.database.max_size
+            )
+            self._write_pool = await self._create_pool(
+                config.database.url,
+                config.database.server_settings,
+                _WRITE_STATEMENTS,
+                min_size=config.database.write_min_size,
+                max_size=config.database.write_max_size,
+                max_queries=config.database.write_max_queries
             )
-            # Создаем таблицы
-            await self.__create_users()
-            await self.__create_profiles()
-            await self.__create_locations()
-            await self.__create_words()
-            await self.__create_translations()
-            await self.__create_contexts()
-            await self.__create_audios()
 
+            self._flush_task = asyncio.create_task(self._flusher())
             self.initialized = True
 
             logger.debug("Database pool initialized successfully")
@@ -50,138 +360,78 @@ class DatabaseService:
             logger.error(f"Database initialization failed: {e}")
             raise
 
-    async def __create_users(self):
-        async with self.acquire_connection() as conn:
-            await conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS users (
-                user_id BIGINT PRIMARY KEY,
-                username VARCHAR(50) NOT NULL,
-                first_name VARCHAR(100) NOT NULL,
-                camefrom VARCHAR(50) NOT NULL,
-                language VARCHAR(20) NOT NULL,
-                fluency SMALLINT NOT NULL,
-                topics TEXT[] NOT NULL,
-                lang_code TEXT NOT NULL,
-                is_active BOOLEAN DEFAULT TRUE,
-                blocked_bot BOOLEAN DEFAULT FALSE,
-                last_notified TIMESTAMP DEFAULT NOW()
-                ); 
-                """
-            )
-
-    async def __create_words(self):
-        async with self.acquire_connection() as conn:
-            await conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS words (
-                id SERIAL PRIMARY KEY,
-                user_id BIGINT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
-                word VARCHAR(100) NOT NULL,
-                is_public BOOLEAN DEFAULT FALSE,
-                word_state VARCHAR(20) DEFAULT 'NEW',
-                emotion VARCHAR(20) DEFAULT 'NEUTRAL',
-                correct_spelling BOOLEAN DEFAULT TRUE,
-                created_at TIMESTAMP DEFAULT NOW(),
-                edited_at TIMESTAMP DEFAULT NOW(),
-                edited BOOLEAN DEFAULT FALSE,
-                UNIQUE (user_id, word)
-                ); 
-            """
-            )
-
-    async def __create_translations(self):
-        # Таблица для переводов и частей речи (несколько записей на слово)
-        async with self.acquire_connection() as conn:
-            await conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS translations (
-                    id SERIAL PRIMARY KEY,
-                    word_id INTEGER NOT NULL REFERENCES words(id) ON DELETE CASCADE,
-                    translation VARCHAR(255) NOT NULL,
-                    part_of_speech VARCHAR(50) NOT NULL,
-                    UNIQUE (word_id, translation, part_of_speech)
-                    );
-                """
-                )
-
-    async def __create_contexts(self):
-        async with self.acquire_connection() as conn:
-            await conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS contexts (
-                id SERIAL PRIMARY KEY,
-                user_id BIGINT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
-                word_id INTEGER NOT NULL REFERENCES words(id) ON DELETE CASCADE,
-                context TEXT NOT NULL,
-                edited BOOLEAN DEFAULT FALSE,
-                created_at TIMESTAMP DEFAULT NOW(),
-                UNIQUE (user_id, word_id)
-                );
-            """
-            )
-
-    async def __create_audios(self):
-        async with self.acquire_connection() as conn:
-            await conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS audios (
-                id SERIAL PRIMARY KEY,
-                user_id BIGINT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
-                audio_id INTEGER NOT NULL REFERENCES words(id) ON DELETE CASCADE,
-                audio_url TEXT NOT NULL,
-                edited BOOLEAN DEFAULT FALSE,
-                created_at TIMESTAMP DEFAULT NOW(),
-                UNIQUE (user_id, audio_id)
-                );
-            """
-            )
-
-    async def __create_profiles(self):
-        async with self.acquire_connection() as conn:
-            await conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS profiles (
-                user_id BIGINT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
-                nickname VARCHAR(50) NOT NULL,
-                email VARCHAR(50) NOT NULL,
-                birthday DATE NOT NULL,
-                dating BOOLEAN DEFAULT FALSE,
-                gender VARCHAR(50) NULL,
-                intro TEXT NULL,
-                status VARCHAR(50) NOT NULL,
-                UNIQUE (user_id)
-                ); 
-                """
-            )
-
-    async def __create_locations(self):
-        async with self.acquire_connection() as conn:
-            await conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS locations (
-                user_id BIGINT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
-                latitude TEXT NULL,
-                longitude TEXT NULL,
-                city TEXT NULL,
-                country TEXT NULL,
-                timezone TEXT NULL
-                ); 
-                """
-            )
+    async def _create_pool(
+            self, url: str, server_settings: Dict[str, str], statements: Dict[str, str], **kwargs
+    ) -> asyncpg.Pool:
+        return await asyncpg.create_pool(
+            url,
+            timeout=config.database.timeout,
+            command_timeout=config.database.command_timeout,
+            max_inactive_connection_lifetime=config.database.max_inactive_connection_lifetime,
+            statement_cache_size=config.database.statement_cache_size,
+            max_cached_statement_lifetime=config.database.max_cached_statement_lifetime,
+            server_settings=server_settings,
+            connection_class=_Connection,
+            init=partial(self._warm_connection, statements=statements),
+            **kwargs
+        )
+
+    @staticmethod
+    async def _create_schema(conn):
+        """ Создает все таблицы за один запрос """
+        await conn.execute(_SCHEMA_SQL)
+
+    @staticmethod
+    async def _warm_connection(conn, statements: Dict[str, str]):
+        """ Готовит частые запросы пула один раз при открытии соединения """
+        for name, sql in statements.items():
+            conn.statements[name] = await conn.prepare(sql)
 
     @asynccontextmanager
-    async def acquire_connection(self):
-        """Асинхронный контекстный менеджер для работы с соединениями"""
-        conn = await self._pool.acquire()
-        try:
+    async def acquire_connection(self, read_only: bool = False):
+        """
+        Асинхронный контекстный менеджер для работы с соединениями.
+        read_only=True берет соединение из пула для чтения
+        """
+        pool = self._read_pool if read_only else self._write_pool
+        # Ожидание считается только при исчерпанном пуле: иначе долгий
+        # acquire означает открытие и прогрев нового соединения
+        saturated = pool.get_idle_size() == 0 and pool.get_size() >= pool.get_max_size()
+        started = time.monotonic()
+        # Pool.acquire() сам возвращает соединение в пул при любом исходе
+        async with pool.acquire() as conn:
+            if saturated:
+                waited = time.monotonic() - started
+                if waited > config.database.acquire_wait_warn:
+                    self._warn_slow_acquire(pool, waited)
             yield conn
-        finally:
-            await self._pool.release(conn)
+
+    def _warn_slow_acquire(self, pool: asyncpg.Pool, waited: float) -> None:
+        now = time.monotonic()
+        if now - self._last_acquire_warning < config.database.acquire_wait_warn_interval:
+            return
+        self._last_acquire_warning = now
+        logger.warning(
+            "Waited %.1f ms for a connection (pool size %s/%s), consider raising max_size",
+            waited * 1000, pool.get_size(), pool.get_max_size()
+        )
+
+    @staticmethod
+    async def _prepared(conn, name: str):
+        """
+        Возвращает подготовленный запрос из кэша соединения.
+        Обычно он уже готов после _warm_connection; иначе
+        (запрос другого пула) готовится при первом использовании
+        """
+        stmt = conn.statements.get(name)
+        if stmt is None:
+            stmt = await conn.prepare(_HOT_STATEMENTS[name])
+            conn.statements[name] = stmt
+        return stmt
 
     async def get_version(self):
         """ Получает версию БД от Postgres """
-        async with self.acquire_connection() as conn:
+        async with self.acquire_connection(read_only=True) as conn:
             try:
                 return await conn.fetchval(
                     """
@@ -219,7 +469,8 @@ class DatabaseService:
                     user_data.topics,
                     user_data.lang_code,
                 )
-                logger.info(f"User {user_data.user_id} created/updated: {result}")
+                self._invalidate_bundle(user_data.user_id)
+                logger.info("User %s created/updated: %s", user_data.user_id, result)
 
 
             except Exception as e:
@@ -252,10 +503,12 @@ class DatabaseService:
                     profile_data.user_id, profile_data.nickname, profile_data.email, profile_data.birthday,
                     profile_data.dating, profile_data.gender, profile_data.intro, profile_data.status
                 )
+                self._invalidate_bundle(profile_data.user_id)
                 logger.debug(
-                    f"User {profile_data.user_id} profile added. Their name: {profile_data.nickname}, "
-                    f"email: {profile_data.email}, birthday: {profile_data.birthday}, dating: {profile_data.dating}, "
-                    f"gender: {profile_data.gender}, status: {profile_data.status},\n intro: {profile_data.intro}"
+                    "User %s profile added. Their name: %s, email: %s, birthday: %s, dating: %s, "
+                    "gender: %s, status: %s,\n intro: %s",
+                    profile_data.user_id, profile_data.nickname, profile_data.email, profile_data.birthday,
+                    profile_data.dating, profile_data.gender, profile_data.status, profile_data.intro
                 )
 
             except Exception as e:
@@ -263,12 +516,15 @@ class DatabaseService:
                 raise
 
 
-    async def get_all_users_for_notification(self) -> List[Tuple[int, str]]:
-        async with self.acquire_connection() as conn:
-            reports = await conn.fetch(
+    async def get_all_users_for_notification(self) -> List[asyncpg.Record]:
+        """
+        Пользователи для рассылки. Record распаковывается как кортеж
+        (user_id, last_notified), поэтому строки отдаются без копирования
+        """
+        async with self.acquire_connection(read_only=True) as conn:
+            return await conn.fetch(
                 "SELECT DISTINCT user_id, last_notified FROM users WHERE user_id IS NOT NULL AND blocked_bot = false"
             )
-            return [ ( int(report["user_id"]), report["last_notified"] ) for report in reports ]
 
     async def save_location(
             self, location: Location
@@ -293,10 +549,11 @@ class DatabaseService:
                     location.country,
                     location.tzone,
                 )
+                self._invalidate_bundle(location.user_id)
                 logger.info(
-                    f"User {location.user_id} location added: "
-                    f"{location.latitude}, {location.longitude}, "
-                    f"{location.city}, {location.country}, {location.tzone}"
+                    "User %s location added: %s, %s, %s, %s, %s",
+                    location.user_id, location.latitude, location.longitude,
+                    location.city, location.country, location.tzone
                 )
 
         except Exception as e:
@@ -305,7 +562,7 @@ class DatabaseService:
 
 
     async def query_criteria_by_target(self, user_id: int, target: Target) -> dict:
-        async with self.acquire_connection() as conn:
+        async with self.acquire_connection(read_only=True) as conn:
             try:
                 if target is Target.ALL:
                     # Возвращает все данные о пользователе
@@ -322,66 +579,69 @@ class DatabaseService:
                         """,
                         user_id,
                     )
-                elif target.value in ['users', 'profiles']:
+                elif target is Target.USER or target is Target.PROFILE:
                     row = await conn.fetchrow(
                         f"SELECT * FROM {target.value} WHERE user_id = $1", user_id
                     )
 
                 else:
-                    # Обновляет нужный критерий пользователя,
-                    # динамическая выбирая талицу в БД
-                    table = {
-                        'language': 'users', 'fluency': 'users',
-                        'topics': 'users', 'username': 'users',
-                        'nickname': 'profiles', 'email': 'profiles',
-                        'birthday': 'profiles', 'dating': 'profiles',
-                        'gender': 'profiles', 'about': 'profiles'
-                    }.get(target.value, None)
-
-                    if table:
-                        # Отправляет SQL запрос в БД
-                        row = await conn.fetchrow(
-                            f"SELECT {target.value} FROM {table} WHERE user_id = $1", user_id
-                        )
+                    # Запрос для критерия выбирается по таблице, где он хранится
+                    sql = _SELECT_TARGET_SQL.get(target.value)
+                    row = await conn.fetchrow(sql, user_id) if sql else None
 
                 return dict(row) if row else None
 
             except Exception as e:
                 logger.error(f"Error getting target criterion: {e}")
 
+    async def query_target_if_profile_exists(self, user_id: int, target: Target) -> Optional[dict]:
+        """
+        Извлекает данные цели, требующей профиль, за один запрос.
+        Возвращает None, если профиля у пользователя нет
+        """
+        columns = _PROFILE_TARGET_COLUMNS[target]
+        async with self.acquire_connection(read_only=True) as conn:
+            try:
+                # Строка есть только при наличии профиля,
+                # поэтому отдельная проверка profile_exists не нужна
+                row = await conn.fetchrow(
+                    f"""
+                    SELECT {columns}
+                    FROM profiles p
+                    JOIN users u
+                      ON u.user_id = p.user_id
+                    WHERE p.user_id = $1
+                    """,
+                    user_id,
+                )
+                return dict(row) if row else None
+
+            except Exception as e:
+                logger.error(f"Error getting target criterion with profile: {e}")
+                raise
+
     async def update_profile(self, user_id: int, target: Target, data: str) -> None:
         """ Обновляет одну из выбранных таблиц с выбранными аргументами """
+        sql = _UPDATE_TARGET_SQL.get(target.value)
+        if sql is None: return
         async with self.acquire_connection() as conn:
-            table = {
-                'language': 'users', 'fluency': 'users',
-                'topics': 'users', 'username': 'users',
-                'nickname': 'profiles', 'email': 'profiles',
-                'birtday': 'profiles','dating': 'profiles',
-                'gender': 'profiles', 'about': 'profiles'
-            }.get(target.value, None)
-
-            if table is None: return
             try:
-                await conn.execute(
-                    f"UPDATE {table} SET {target.value} = $1 WHERE user_id = $2",
-                    data, user_id,
-                )
+                await conn.execute(sql, data, user_id)
+                self._invalidate_bundle(user_id)
             except Exception as e:
-                raise logger.error(f'Error updating profile: {e}')
+                logger.error(f'Error updating profile: {e}')
+                raise
 
     async def get_location(self, user_id: int):
-        async with self.acquire_connection() as conn:
-            row = await conn.fetchrow(
-                "SELECT city, country FROM locations WHERE user_id = $1", user_id
-            )
+        async with self.acquire_connection(read_only=True) as conn:
+            stmt = await self._prepared(conn, 'get_location')
+            row = await stmt.fetchrow(user_id)
             return dict(row) if row else None
 
-    async def word_exists(self, word_data: Word):
-        async with self.acquire_connection() as conn:
-            return bool(await conn.fetchrow(
-                'SELECT 1 FROM words WHERE user_id = $1 AND word = $2',
-                word_data.user_id, word_data.word)
-            )
+    async def word_exists(self, word_data: Word) -> bool:
+        async with self.acquire_connection(read_only=True) as conn:
+            stmt = await self._prepared(conn, 'word_exists')
+            return await stmt.fetchval(word_data.user_id, word_data.word)
 
 
     async def query_words(self, user_id: Optional[int] = None, word: Optional[str] = None):
@@ -392,7 +652,7 @@ class DatabaseService:
         Только word -> происходит поиск всех публичных слов
 
         Возвращает словарь result, где ключ - int(user_id)
-        со списком из Word моделей, содержащий поле translations
+        со списком из WordRow, содержащий поле translations
         со словарем из переводов вида:
         {
             '1': {
@@ -404,7 +664,7 @@ class DatabaseService:
         }
         """
         try:
-            async with self.acquire_connection() as conn:
+            async with self.acquire_connection(read_only=True) as conn:
                 if user_id:
                     # Поиск слов по user_id пользователя
                     where_condition = "w.user_id = $1"
@@ -461,137 +721,79 @@ class DatabaseService:
                     word_ids
                 )
 
-                # Группируем переводы по word_id
-                translations_by_word = defaultdict(list)
+                # Группируем переводы по word_id сразу в формате
+                # ответа: {'1': {...}, '2': {...}}
+                translations_by_word = defaultdict(dict)
                 for row in translations_rows:
-                    word_id = row['word_id']
-                    translations_by_word[word_id].append({
+                    word_translations = translations_by_word[row['word_id']]
+                    word_translations[str(len(word_translations) + 1)] = {
                         'translation': row['translation'],
                         'part_of_speech': row['part_of_speech']
-                    })
+                    }
 
 
                 for row in rows:
                     word_id = row['id']
-                    user_id_key = int(row["user_id"])
+                    word_user_id = row["user_id"]
 
                     # Получаем переводы для текущего слова
-                    word_translations = translations_by_word.get(word_id, [])
-
-                    # Преобразуем переводы в новый формат: {'1': {...}, '2': {...}}
-                    translations_dict = {}
-                    for i, trans in enumerate(word_translations, 1):
-                        translations_dict[str(i)] = {
-                            'translation': trans['translation'],
-                            'part_of_speech': trans['part_of_speech']
-                        }
+                    translations_dict = translations_by_word.get(word_id, {})
 
                     # Создаем слово в новом формате
-                    word_obj = {
-                        'id': word_id,
-                        'user_id': row['user_id'],
-                        'nickname': row['nickname'],
-                        'word': row['word'],
-                        'translations': translations_dict,
-                        'is_public': row.get('is_public', False),
-                        'created_at': row['created_at'].isoformat(),
-                        'context': row.get('context'),
-                        'audio': None
-                    }
-
-                    result[user_id_key].append(Word(**word_obj))
-
-                logger.debug(f'Formatted words result: {result}')
+                    result[word_user_id].append(WordRow(
+                        id=word_id,
+                        user_id=word_user_id,
+                        nickname=row['nickname'],
+                        word=row['word'],
+                        translations=translations_dict,
+                        is_public=row.get('is_public', False),
+                        created_at=row['created_at'].isoformat(),
+                        context=row.get('context'),
+                    ))
+
+                logger.debug('Formatted words result: %s', result)
                 return result
 
         except Exception as e:
             logger.error(f"Database error in query_words: {e}")
             return {}
 
-    async def save_word(self, word_data: Word) -> None:
+    async def save_word(self, word_data: Word, overwrite: bool = True) -> bool:
+        """
+        Сохраняет слово с переводами, контекстом и аудио.
+        При overwrite=False существующее слово не изменяется,
+        и метод возвращает False
+        """
+        translations = word_data.translations or {}
         async with self.acquire_connection() as conn:
             try:
-                async with conn.transaction():
-                    # 1. Создание слова (или получение id существующего)
-                    row = await conn.fetchrow(
-                        """
-                        INSERT INTO words (user_id, word, is_public)
-                        VALUES ($1, $2, $3)
-                        ON CONFLICT (user_id, word) DO NOTHING
-                        RETURNING id
-                        """,
-                        word_data.user_id,
-                        word_data.word,
-                        word_data.is_public
-                    )
-
-                    if row is None:
-                        row = await conn.fetchrow(
-                            """
-                            UPDATE words
-                            SET is_public = $3,
-                                edited = TRUE,
-                                edited_at = NOW()
-                            WHERE user_id = $1 AND word = $2
-                            RETURNING id
-                            """,
-                            word_data.user_id,
-                            word_data.word,
-                            word_data.is_public
-                        )
-
-                    word_id: int = row["id"]
-
-                    # 2. Переводы
-                    if word_data.translations:
-                        await conn.executemany(
-                            """
-                            INSERT INTO translations (word_id, translation, part_of_speech)
-                            VALUES ($1, $2, $3)
-                            ON CONFLICT (word_id, translation, part_of_speech) DO NOTHING
-                            """,
-                            [
-                                (word_id, translation, part)
-                                for translation, part in word_data.translations.items()
-                            ]
-                        )
-
-                    # 3. Контекст
-                    if word_data.context:
-                        await conn.execute(
-                            """
-                            INSERT INTO contexts (user_id, word_id, context)
-                            VALUES ($1, $2, $3)
-                            ON CONFLICT (user_id, word_id) DO UPDATE
-                            SET context = EXCLUDED.context,
-                                edited = TRUE
-                            """,
-                            word_data.user_id,
-                            word_id,
-                            word_data.context
-                        )
-
-                    # 4. Аудио
-                    if word_data.audio:
-                        await conn.execute(
-                            """
-                            INSERT INTO audios (user_id, audio_id, audio_url)
-                            VALUES ($1, $2, $3)
-                            ON CONFLICT (user_id, audio_id) DO UPDATE
-                            SET audio_url = EXCLUDED.audio_url,
-                                edited = TRUE
-                            """,
-                            word_data.user_id,
-                            word_id,
-                            word_data.audio
-                        )
+                stmt = await self._prepared(conn, 'save_word')
+                word_id = await stmt.fetchval(
+                    word_data.user_id,
+                    word_data.word,
+                    word_data.is_public,
+                    overwrite,
+                    list(translations.keys()),
+                    list(translations.values()),
+                    word_data.context or None,
+                    word_data.audio or None
+                )
 
+                if word_id is None:
                     logger.debug(
-                        "Word saved successfully: user_id=%s, word='%s', word_id=%s",
+                        "Word already exists, skipping: user_id=%s, word='%s'",
                         word_data.user_id,
-                        word_data.word,
-                        word_id
+                        word_data.word
                     )
+                    return False
+
+                logger.debug(
+                    "Word saved successfully: user_id=%s, word='%s', word_id=%s",
+                    word_data.user_id,
+                    word_data.word,
+                    word_id
+                )
+                return True
 
             except Exception:
                 logger.error(
@@ -612,171 +814,280 @@ class DatabaseService:
     async def mark_repeated_words(self, nickname: str, message: str) -> bool:
         """Помечает слова из сообщения как повторенные одним запросом"""
         async with self.acquire_connection() as conn:
-            # Нормализуем слова из сообщения
-            message_words = {word.strip().lower() for word in message.split()}
-
-            # Обновляем состояние слов одним запросом
+            # Нормализация и удаление повторов выполняются в Postgres,
+            # сравнение идет по индексу words_user_lower_word_idx
             result = await conn.execute(
                 """
-                UPDATE words 
+                UPDATE words w
                 SET word_state = 'REPEATED'
-                WHERE user_id = (
+                FROM (
+                    SELECT DISTINCT LOWER(x) AS word
+                    FROM UNNEST($2::text[]) AS x
+                ) t
+                WHERE w.user_id = (
                     SELECT p.user_id
                     FROM profiles p
                     WHERE p.nickname = $1
                     LIMIT 1
                 )
-                AND word_state = 'NEW'
-                AND LOWER(word) = ANY($2)
+                AND w.word_state = 'NEW'
+                AND LOWER(w.word) = t.word
                 """,
                 nickname,
-                list(message_words)
+                message.split()
             )
 
             # Проверяем, были ли обновлены какие-либо строки
-            return bool(result)
+            # (execute возвращает статус вида 'UPDATE <n>')
+            return result != 'UPDATE 0'
 
     async def update_notified_time(self, user_id: int) -> None:
-        curr_time = datetime.now(tz=config.tz_info).replace(tzinfo=None)
-        async with self.acquire_connection() as conn:
-            await conn.execute(
-                "UPDATE users SET last_notified = $1 WHERE user_id = $2", curr_time, user_id
-            )
+        """ Ставит обновление last_notified в очередь пакетного сброса """
+        self._notified.add(user_id)
 
     async def get_user_stats(self, user_id: int):
-        async with self.stats_lock:
-            async with self.acquire_connection() as conn:
-                try:
-                    row = await conn.fetchrow(
-                        """
-                        SELECT
-                          COUNT(*) FILTER (WHERE t.part_of_speech = 'noun') AS nouns,
-                          COUNT(*) FILTER (WHERE t.part_of_speech = 'verb') AS verbs,
-                          COUNT(*) FILTER (WHERE t.part_of_speech = 'adjective') AS adjectives,
-                          COUNT(*) FILTER (WHERE t.part_of_speech = 'adverb') AS adverbs,
-                          COUNT(*) FILTER (WHERE t.part_of_speech = 'other') AS others
-                        FROM words w
-                        LEFT JOIN translations t
-                            ON w.id = t.word_id
-                        WHERE w.user_id = $1
-                        """,
-                        user_id,
-                    )
+        """
+        Статистика слов по частям речи и число слов
+        за последнюю неделю за один запрос
+        """
+        async with self.acquire_connection(read_only=True) as conn:
+            try:
+                row = await conn.fetchrow(
+                    """
+                    SELECT
+                      COUNT(*) FILTER (WHERE t.part_of_speech = 'noun') AS nouns,
+                      COUNT(*) FILTER (WHERE t.part_of_speech = 'verb') AS verbs,
+                      COUNT(*) FILTER (WHERE t.part_of_speech = 'adjective') AS adjectives,
+                      COUNT(*) FILTER (WHERE t.part_of_speech = 'adverb') AS adverbs,
+                      COUNT(*) FILTER (WHERE t.part_of_speech = 'other') AS others,
+                      COUNT(DISTINCT w.id) FILTER (
+                        WHERE w.created_at >= LOCALTIMESTAMP - INTERVAL '7 days'
+                      ) AS last_week
+                    FROM words w
+                    LEFT JOIN translations t
+                        ON w.id = t.word_id
+                    WHERE w.user_id = $1
+                    """,
+                    user_id,
+                )
 
-                    return Stats(**row) if row else Stats()
+                return Stats(**row) if row else Stats()
 
-                except Exception as e:
-                    logger.error(f"Database error in get_user_stats: {e}")
+            except Exception as e:
+                logger.error(f"Database error in get_user_stats: {e}")
 
     async def get_user_stats_last_week(self, user_id: int):
-        async with self.stats_lock:
-            async with self.acquire_connection() as conn:
-                try:
-                    all_words_last_week_count_row = await conn.fetchrow(
-                        """SELECT COUNT(*) FROM words WHERE user_id = $1 AND created_at >= $2""",
-                        user_id,
-                        datetime.now() - timedelta(days=7),
-                    )
-                    if all_words_last_week_count_row:
-                        return all_words_last_week_count_row["count"]
-
-                    else:
-                        return 0
-
-                except Exception as e:
-                    logger.error(f"Database error: {e}")
-                    return None
+        """ Число слов за последнюю неделю (входит в get_user_stats) """
+        stats = await self.get_user_stats(user_id)
+        return stats.last_week if stats else None
 
     async def user_exists(self, user_id: int) -> bool:
-        async with self.acquire_connection() as conn:
-            return bool(
-                await conn.fetchrow("SELECT 1 FROM users WHERE user_id = $1", user_id)
-            )
+        async with self.acquire_connection(read_only=True) as conn:
+            stmt = await self._prepared(conn, 'user_exists')
+            return await stmt.fetchval(user_id)
 
     async def profile_exists(self, user_id: int) -> bool:
-        async with self.acquire_connection() as conn:
-            return bool(
-                await conn.fetchrow(
-                    "SELECT 1 FROM profiles WHERE user_id = $1", user_id
-                )
-            )
+        async with self.acquire_connection(read_only=True) as conn:
+            stmt = await self._prepared(conn, 'profile_exists')
+            return await stmt.fetchval(user_id)
 
     async def location_exists(self, user_id: int) -> bool:
-        async with self.acquire_connection() as conn:
-            return bool(
-                await conn.fetchrow(
-                    "SELECT 1 FROM locations WHERE user_id = $1", user_id
-                )
-            )
+        async with self.acquire_connection(read_only=True) as conn:
+            stmt = await self._prepared(conn, 'location_exists')
+            return await stmt.fetchval(user_id)
 
-    async def nickname_exists(self, nickname: str):
-        async with self.acquire_connection() as conn:
-            return bool(
-                await conn.fetchrow(
-                    "SELECT 1 FROM profiles WHERE nickname = $1", nickname
-                )
-            )
+    async def nickname_exists(self, nickname: str) -> bool:
+        async with self.acquire_connection(read_only=True) as conn:
+            stmt = await self._prepared(conn, 'nickname_exists')
+            return await stmt.fetchval(nickname)
 
-    async def get_words_by_user(self) -> List[Dict]:
-        current_time = datetime.now(tz=config.tz_info).replace(tzinfo=None)
-        async with self.acquire_connection() as conn:
-            return await conn.fetch(
+    async def get_user_flags(self, user_id: int) -> Dict[str, bool]:
+        """
+        Возвращает все признаки пользователя одним запросом
+        вместо отдельных вызовов *_exists и is_user_blocked
+        """
+        async with self.acquire_connection(read_only=True) as conn:
+            stmt = await self._prepared(conn, 'get_user_flags')
+            return dict(await stmt.fetchrow(user_id))
+
+    async def get_user_bundle(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Пользователь, профиль и локация одним запросом.
+        Результат кэшируется на USER_BUNDLE_TTL секунд и сбрасывается
+        при любом изменении этих таблиц через сервис. При настроенной
+        реплике кэш заполняется из основной БД: отстающая реплика
+        вернула бы строку до записи, и она жила бы в кэше весь TTL
+        """
+        cached = self._bundles.get(user_id)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                self._bundles.move_to_end(user_id)
+                return cached[1]
+            del self._bundles[user_id]
+
+        in_flight, generation = self._bundle_fetches.get(user_id, (0, 0))
+        self._bundle_fetches[user_id] = (in_flight + 1, generation)
+        try:
+            async with self.acquire_connection(read_only=not config.database.has_replica) as conn:
+                stmt = await self._prepared(conn, 'get_user_bundle')
+                row = await stmt.fetchrow(user_id)
+        finally:
+            in_flight, current = self._bundle_fetches.pop(user_id)
+            if in_flight > 1:
+                self._bundle_fetches[user_id] = (in_flight - 1, current)
+        if row is None:
+            return None
+
+        bundle = dict(row)
+        if current != generation:
+            # Данные изменились, пока шло чтение: строка могла
+            # оказаться старой, поэтому в кэш ее не кладем
+            return bundle
+        self._bundles[user_id] = (time.monotonic() + USER_BUNDLE_TTL, bundle)
+        if len(self._bundles) > USER_BUNDLE_CACHE_SIZE:
+            self._bundles.popitem(last=False)
+        return bundle
+
+    def _invalidate_bundle(self, user_id: int) -> None:
+        self._bundles.pop(user_id, None)
+        fetch = self._bundle_fetches.get(user_id)
+        if fetch is not None:
+            self._bundle_fetches[user_id] = (fetch[0], fetch[1] + 1)
+
+    async def iter_words_by_user(self) -> AsyncIterator[asyncpg.Record]:
+        """
+        Отдает слова к повторению по пользователям через серверный
+        курсор, не загружая весь результат в память
+        """
+        async with self.acquire_connection(read_only=True) as conn, conn.transaction():
+            async for row in conn.cursor(
                 """
                 SELECT user_id, ARRAY_AGG(DISTINCT word) as words
                 FROM words 
                 WHERE word_state != 'LEARNED' 
                    AND word IS NOT NULL 
-                   AND $1 - created_at >= CASE word_state
+                   AND (NOW() AT TIME ZONE $1::interval) - created_at >= CASE word_state
                        WHEN 'NEW' THEN INTERVAL '1 days'
                        WHEN 'REPEATED' THEN INTERVAL '5 days'
                        WHEN 'REINFORCED' THEN INTERVAL '14 days'
                    END 
                 GROUP BY user_id
-                """, current_time
-            )
+                """, _TZ_OFFSET, prefetch=200
+            ):
+                yield row
 
     async def update_word_state(self, user_id: int, word: str, correct: bool):
+        async with self.acquire_connection() as conn:
+            stmt = await self._prepared(conn, 'update_word_state')
+            await stmt.fetch(user_id, word, correct)
+
+    async def update_word_states_bulk(self, user_id: int, updates: List[Tuple[str, bool]]) -> None:
+        """
+        Применяет накопленные ответы пользователя (слово, верно ли)
+        одним запросом. Ответы на одно и то же слово применяются
+        по очереди в порядке списка, как при отдельных вызовах
+        update_word_state
+        """
+        if not updates:
+            return
+        words, correct = zip(*updates)
         async with self.acquire_connection() as conn:
             await conn.execute(
                 """
-                UPDATE words 
-                SET word_state = CASE 
-                    WHEN $3 = true THEN 
-                        CASE word_state 
-                            WHEN 'NEW' THEN 'REPEATED'
-                            WHEN 'REPEATED' THEN 'REINFORCED' 
-                            WHEN 'REINFORCED' THEN 'LEARNED'
-                            ELSE word_state
-                        END
-                    ELSE 
-                        CASE word_state 
-                            WHEN 'REPEATED' THEN 'NEW'
-                            WHEN 'REINFORCED' THEN 'REPEATED'
-                            WHEN 'LEARNED' THEN 'REINFORCED'
-                            ELSE word_state
-                        END
-                END
-                WHERE user_id = $1 AND word = $2
-            """, user_id, word, correct
+                WITH RECURSIVE answers AS (
+                    -- Номер ответа в пределах слова задает порядок переходов
+                    SELECT t.word, t.correct,
+                           ROW_NUMBER() OVER (PARTITION BY t.word ORDER BY t.n) AS step
+                    FROM UNNEST($2::text[], $3::bool[]) WITH ORDINALITY AS t(word, correct, n)
+                ),
+                walk AS (
+                    SELECT w.id, w.word, w.word_state::text AS state, 0::bigint AS step
+                    FROM words w
+                    WHERE w.user_id = $1 AND w.word IN (SELECT word FROM answers)
+                    UNION ALL
+                    SELECT walk.id, walk.word,
+                           word_state_transition(walk.state, a.correct), a.step
+                    FROM walk
+                    JOIN answers a ON a.word = walk.word AND a.step = walk.step + 1
+                )
+                UPDATE words w
+                SET word_state = f.state
+                FROM (
+                    SELECT DISTINCT ON (id) id, state
+                    FROM walk
+                    ORDER BY id, step DESC
+                ) f
+                WHERE w.id = f.id
+                """,
+                user_id, list(words), list(correct)
             )
 
     async def is_user_blocked(self, user_id: int) -> bool:
-        async with self.acquire_connection() as conn:
-            return await conn.fetchval(
-                "SELECT blocked_bot FROM users WHERE user_id = $1", user_id
-            )
+        async with self.acquire_connection(read_only=True) as conn:
+            stmt = await self._prepared(conn, 'is_user_blocked')
+            return await stmt.fetchval(user_id)
 
     async def mark_user_as_blocked(self, user_id: int):
-        async with self.acquire_connection() as conn:
-            await conn.execute(
-                "UPDATE users SET is_active = FALSE, blocked_bot = TRUE WHERE user_id = $1",
-                user_id,
-            )
-            logger.info(f"Пользователь {user_id} помечен как заблокированный в БД.")
+        """ Ставит блокировку пользователя в очередь пакетного сброса """
+        self._blocked.add(user_id)
+        logger.info("Пользователь %s будет помечен как заблокированный в БД.", user_id)
+
+    async def _flusher(self):
+        """
+        Фоновая задача: раз в USER_UPDATES_FLUSH_INTERVAL записывает
+        накопленные обновления пользователей одним UPDATE на тип
+        вместо запроса на каждого пользователя
+        """
+        while True:
+            await asyncio.sleep(USER_UPDATES_FLUSH_INTERVAL)
+            try:
+                await self._flush_user_updates()
+            except Exception as e:
+                logger.error("Error flushing user updates: %s", e)
+
+    async def _flush_user_updates(self):
+        if not self._notified and not self._blocked:
+            return
+
+        notified, self._notified = self._notified, set()
+        blocked, self._blocked = self._blocked, set()
+        try:
+            async with self.acquire_connection() as conn:
+                if notified:
+                    await conn.execute(
+                        """
+                        UPDATE users SET last_notified = NOW() AT TIME ZONE $1::interval
+                        WHERE user_id = ANY($2::bigint[])
+                        """,
+                        _TZ_OFFSET, list(notified)
+                    )
+                if blocked:
+                    await conn.execute(
+                        """
+                        UPDATE users SET is_active = FALSE, blocked_bot = TRUE
+                        WHERE user_id = ANY($1::bigint[])
+                        """,
+                        list(blocked)
+                    )
+            for user_id in notified | blocked:
+                self._invalidate_bundle(user_id)
+        except BaseException:
+            # Возвращаем id, чтобы повторить при следующем сбросе
+            # (в том числе при отмене задачи посреди запроса)
+            self._notified |= notified
+            self._blocked |= blocked
+            raise
 
     async def disconnect(self):
         if self.initialized:
-            await self._pool.close()
+            self._flush_task.cancel()
+            # Ждем завершения задачи: прерванный сброс возвращает
+            # свои id в очередь, и финальный сброс их подхватит
+            with suppress(asyncio.CancelledError):
+                await self._flush_task
+            # Записываем то, что не успело уйти до остановки
+            await self._flush_user_updates()
+            await asyncio.gather(self._read_pool.close(), self._write_pool.close())
 
 
 database_service = DatabaseService()
@@ -1,20 +1,34 @@
-import json
-from typing import TYPE_CHECKING, Optional
+import asyncio
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
 import aio_pika
+import orjson
 
-from src.config import config
+from src.config import config, Purpose
 from src.logconf import opt_logger as log
 from src.models import Location, User, Profile, Payment, Word
 
 if TYPE_CHECKING:
-    from aio_pika.abc import AbstractChannel
+    from aio_pika.abc import AbstractChannel, AbstractExchange
     from aio_pika.abc import AbstractRobustConnection
     from src.models.bot_models import User
 
 
 logger = log.setup_logger('rabbitmq')
 
+# Максимум сообщений в одной пачке публикации
+PUBLISH_BATCH_SIZE = 100
+# Предел очереди публикации, после которого publish_* ждут освобождения
+PUBLISH_QUEUE_SIZE = 10_000
+# Пауза перед повторной публикацией после ошибки брокера (секунды),
+# удваивается до максимума, пока публикация не пройдет
+PUBLISH_RETRY_MIN_DELAY = 0.5
+PUBLISH_RETRY_MAX_DELAY = 30.0
+# Сколько ждать отправки накопленных сообщений при остановке (секунды)
+PUBLISH_DRAIN_TIMEOUT = 10.0
+
+_QueueItem = Tuple["AbstractExchange", aio_pika.Message, str]
+
 
 class RabbitMQService:
     def __init__(self):
@@ -22,9 +36,18 @@ class RabbitMQService:
         self.channel: Optional["AbstractChannel"] = None
         self.default_exchange = None
         self.new_users_exchange = None
+        self.new_words_exchange = None
         self.messages_exchange = None
         self.initialized = False
 
+        # Очередь сообщений и задача, публикующая их пачками
+        self._queue: Optional[asyncio.Queue] = None
+        self._publisher_task: Optional[asyncio.Task] = None
+        # Сообщения, которые брокер не принял; публикуются повторно
+        self._retry: List[_QueueItem] = []
+        # Пачка, ожидающая подтверждения брокера
+        self._in_flight: List[_QueueItem] = []
+
     async def connect(self):
         """Установка подключения к RabbitMQ"""
         self.connection = await aio_pika.connect_robust(config.rabbit.url)
@@ -34,6 +57,9 @@ class RabbitMQService:
         # Объявляем обменники и очереди при подключении
         await self.declare_exchanges_and_queues()
 
+        self._queue = asyncio.Queue(maxsize=PUBLISH_QUEUE_SIZE)
+        self._publisher_task = asyncio.create_task(self._publisher())
+
         self.initialized = True
 
     async def declare_exchanges_and_queues(self):
@@ -59,83 +85,154 @@ class RabbitMQService:
 
     async def publish_user(self, user: User):
         """Публикация нового пользователя и транзакции"""
-        json_user = json.dumps({
+        json_user = orjson.dumps({
+            "p": Purpose.ADD_USER,
             "purpose": config.purpose.add_user,
-            "user": user.model_dump_json(),
-        }).encode()
+            "user": user.model_dump(mode='json'),
+        })
 
-        logger.info(f'received data: {user}')
+        logger.info('received data: %s', user)
 
-        await self.new_users_exchange.publish(
-            aio_pika.Message(
-                body=json_user, delivery_mode=aio_pika.DeliveryMode.PERSISTENT
-            ),
-            routing_key=config.rabbit.queue.new_users
+        await self._enqueue(
+            self.new_users_exchange, json_user, config.rabbit.queue.new_users
         )
 
     async def publish_payment(self, payment: Payment):
         """Публикация нового пользователя и транзакции"""
-        json_payment = json.dumps({
+        json_payment = orjson.dumps({
+            "p": Purpose.ADD_PAYMENT,
             "purpose": config.purpose.add_payment,
-            "payment": payment.model_dump_json(),
-        }).encode()
+            "payment": payment.model_dump(mode='json'),
+        })
 
-        logger.info(f'Received data: {payment}')
+        logger.info('Received data: %s', payment)
 
-        await self.new_users_exchange.publish(
-            aio_pika.Message(
-                body=json_payment, delivery_mode=aio_pika.DeliveryMode.PERSISTENT
-            ),
-            routing_key=config.rabbit.queue.new_users
+        await self._enqueue(
+            self.new_users_exchange, json_payment, config.rabbit.queue.new_users
         )
 
 
     async def publish_profile(self, profile: "Profile"):
-        json_profile = json.dumps({
+        json_profile = orjson.dumps({
+            "p": Purpose.ADD_PROFILE,
             "purpose": config.purpose.add_profile,
-            "profile": profile.model_dump_json()
-        }).encode()
-
-        await self.new_users_exchange.publish(
-            aio_pika.Message(
-                body=json_profile, delivery_mode=aio_pika.DeliveryMode.PERSISTENT
-            ),
-            routing_key=config.rabbit.queue.new_users
+            "profile": profile.model_dump(mode='json')
+        })
+
+        await self._enqueue(
+            self.new_users_exchange, json_profile, config.rabbit.queue.new_users
         )
 
 
     async def publish_location(self, location: "Location"):
         """ Публикация местоположения пользователя """
-        json_location = json.dumps({
+        json_location = orjson.dumps({
+            "p": Purpose.ADD_LOCATION,
             "purpose": config.purpose.add_location,
-            "location": location.model_dump_json()
-        }).encode()
-
-        await self.new_users_exchange.publish(
-            aio_pika.Message(
-                body=json_location, delivery_mode=aio_pika.DeliveryMode.PERSISTENT
-            ),
-            routing_key=config.rabbit.queue.new_users
+            "location": location.model_dump(mode='json')
+        })
+
+        await self._enqueue(
+            self.new_users_exchange, json_location, config.rabbit.queue.new_users
         )
 
     async def publish_word(self, word_data: Word):
-        """ Публикация слова пользователя """
-        json_word = json.dumps({
+        """ Публикация нового слова пользователя """
+        json_word = orjson.dumps({
+            "p": Purpose.ADD_WORD,
             "purpose": config.purpose.add_word,
-            "word": word_data.model_dump_json()
-        }).encode()
-
-        await self.new_words_exchange.publish(
-            aio_pika.Message(
-                body=json_word, delivery_mode=aio_pika.DeliveryMode.PERSISTENT
-            ),
-            routing_key=config.rabbit.queue.new_words
+            "word": word_data.model_dump(mode='json')
+        })
+
+        await self._enqueue(
+            self.new_words_exchange, json_word, config.rabbit.queue.new_words
         )
 
+    async def publish_word_edit(self, word_data: Word):
+        """ Публикация изменений существующего слова пользователя """
+        json_word = orjson.dumps({
+            "p": Purpose.EDIT_WORD,
+            "purpose": config.purpose.edit_word,
+            "word": word_data.model_dump(mode='json')
+        })
 
+        await self._enqueue(
+            self.new_words_exchange, json_word, config.rabbit.queue.new_words
+        )
+
+
+
+    async def _enqueue(self, exchange: "AbstractExchange", body: bytes, routing_key: str):
+        """ Ставит сообщение в очередь фоновой публикации """
+        message = aio_pika.Message(
+            body=body, delivery_mode=aio_pika.DeliveryMode.PERSISTENT
+        )
+        await self._queue.put((exchange, message, routing_key))
+
+    async def _publisher(self):
+        """
+        Фоновая задача публикации. Забирает все сообщения, накопившиеся
+        в очереди, и публикует их одной пачкой вместо ожидания
+        подтверждения брокера на каждый HTTP-запрос.
+        Не принятые брокером сообщения не теряются: они публикуются
+        повторно с нарастающей паузой и до успеха считаются
+        незавершенными в очереди
+        """
+        delay = PUBLISH_RETRY_MIN_DELAY
+        while True:
+            if self._retry:
+                batch, self._retry = self._retry, []
+            else:
+                batch = [await self._queue.get()]
+            while len(batch) < PUBLISH_BATCH_SIZE and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            self._in_flight = batch
+            results = await asyncio.gather(
+                *(
+                    exchange.publish(message, routing_key=routing_key)
+                    for exchange, message, routing_key in batch
+                ),
+                return_exceptions=True
+            )
+            self._in_flight = []
+            for item, result in zip(batch, results):
+                # CancelledError не наследует Exception: публикация, отмененная
+                # при закрытии канала, тоже не принята брокером
+                if isinstance(result, BaseException):
+                    logger.error("Error publishing to %s: %s", item[2], result)
+                    self._retry.append(item)
+                else:
+                    self._queue.task_done()
+
+            if self._retry:
+                logger.warning(
+                    "Retrying %s unpublished messages in %.1f s", len(self._retry), delay
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, PUBLISH_RETRY_MAX_DELAY)
+            else:
+                delay = PUBLISH_RETRY_MIN_DELAY
 
     async def disconnect(self):
         """Закрытие подключения"""
+        task = self._publisher_task
+        if task:
+            # Дожидаемся отправки уже принятых сообщений, если
+            # задача публикации жива, но не дольше PUBLISH_DRAIN_TIMEOUT
+            if not task.done():
+                try:
+                    await asyncio.wait_for(self._queue.join(), PUBLISH_DRAIN_TIMEOUT)
+                except asyncio.TimeoutError:
+                    pass
+            task.cancel()
+            result, = await asyncio.gather(task, return_exceptions=True)
+            if isinstance(result, Exception):
+                logger.error("Publisher task failed: %s", result)
+
+            unsent = self._queue.qsize() + len(self._retry) + len(self._in_flight)
+            if unsent:
+                logger.error("Shutting down with %s unpublished messages", unsent)
         if self.connection:
             await self.connection.close()
 